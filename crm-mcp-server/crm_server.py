@@ -1,36 +1,97 @@
 #!/usr/bin/env python3
 
 import asyncio
+import atexit
 import json
 import sqlite3
+import time
 import uuid
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import mcp.types as types
 from mcp.server import Server
 import mcp.server.stdio
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
 # Database path
 DB_PATH = "crm_database.db"
 
+# Row caps that keep a single tool response bounded
+SEARCH_DEFAULT_LIMIT = 100
+SEARCH_MAX_LIMIT = 1000
+RECENT_INTERACTIONS_LIMIT = 500
+
 # Create server instance
 app = Server("crm-server")
 
+def _json_default(obj: Any) -> str:
+    # IDs are stored as 16-byte UUID blobs; show them as hex
+    if isinstance(obj, bytes) and len(obj) == 16:
+        return uuid.UUID(bytes=obj).hex
+    return str(obj)
+
+def _dump(obj: Any) -> str:
+    """Serialize query results as indented JSON for tool output."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, default=_json_default)
+
+def _parse_id(value: str) -> bytes:
+    """Convert a client-supplied UUID string (hex or hyphenated) to its stored blob."""
+    return uuid.UUID(value).bytes
+
+def _dump_rows(columns: list[str], rows: list[tuple]) -> str:
+    """Serialize raw result rows as a JSON list of column -> value objects."""
+    return _dump([dict(zip(columns, row)) for row in rows])
+
 class CRMDatabase:
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.init_database()
+        # One long-lived connection: the server handles stdio requests one at a
+        # time, so reusing it keeps SQLite's page cache warm between tool calls.
+        self.conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None, cached_statements=128
+        )
+        atexit.register(self.conn.close)
+        # All statements run on this single worker thread so that tool handlers
+        # never block the event loop and the connection is never used concurrently.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crm-db")
+        # Schema setup goes through the same worker, so after construction no
+        # other thread ever touches the connection.
+        self._executor.submit(self.init_database).result()
     
     def init_database(self):
         """Initialize the CRM database with proper schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        # WAL lets reads proceed alongside writes and, with synchronous=NORMAL,
+        # avoids an fsync on every commit. Must run outside a transaction.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA cache_size=-65536")
+
+        with self.conn as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            
+            # Databases created before IDs became blobs are moved aside here and
+            # copied into the new tables once those exist
+            legacy = self._has_text_ids(cursor)
+            if legacy:
+                for table in ("customers", "interactions", "deals"):
+                    cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
             
             # Create customers table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS customers (
-                    id TEXT PRIMARY KEY,
+                    id BLOB PRIMARY KEY,
                     first_name TEXT NOT NULL,
                     last_name TEXT NOT NULL,
                     email TEXT UNIQUE NOT NULL,
@@ -49,8 +110,8 @@ class CRMDatabase:
             # Create interactions table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS interactions (
-                    id TEXT PRIMARY KEY,
-                    customer_id TEXT NOT NULL,
+                    id BLOB PRIMARY KEY,
+                    customer_id BLOB NOT NULL,
                     interaction_type TEXT NOT NULL,
                     subject TEXT,
                     notes TEXT,
@@ -63,8 +124,8 @@ class CRMDatabase:
             # Create deals table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS deals (
-                    id TEXT PRIMARY KEY,
-                    customer_id TEXT NOT NULL,
+                    id BLOB PRIMARY KEY,
+                    customer_id BLOB NOT NULL,
                     deal_name TEXT NOT NULL,
                     value REAL NOT NULL,
                     stage TEXT DEFAULT 'prospecting',
@@ -75,409 +136,641 @@ class CRMDatabase:
                     FOREIGN KEY (customer_id) REFERENCES customers (id)
                 )
             """)
-            
+
+            if legacy:
+                self._copy_legacy_tables(conn)
+
+            # Text of every searchable field, so an "all" search is a single LIKE
+            # on one column. SQLite's lower() only folds ASCII, so search terms
+            # must go through the same lower() in SQL, not str.lower(). Added
+            # separately so existing databases pick it up too.
+            columns = {row[1] for row in cursor.execute("PRAGMA table_xinfo(customers)")}
+            if "search_blob" not in columns:
+                cursor.execute("""
+                    ALTER TABLE customers ADD COLUMN search_blob TEXT GENERATED ALWAYS AS (
+                        lower(first_name || ' ' || last_name || ' ' || email || ' ' ||
+                              ifnull(company, '') || ' ' || ifnull(industry, ''))
+                    ) VIRTUAL
+                """)
+
+            # Indexes for the analytics and lookup queries
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_industry ON customers (industry)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_revenue ON customers (annual_revenue DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_interactions_customer_date ON interactions (customer_id, interaction_date DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_interactions_date ON interactions (interaction_date)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_customer ON deals (customer_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_stage ON deals (stage)")
+
             conn.commit()
     
-    def execute_query(self, query: str, params: tuple = ()) -> list[dict[str, Any]]:
-        """Execute a SELECT query safely with parameterized inputs."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
+    def _has_text_ids(self, cursor: sqlite3.Cursor) -> bool:
+        """Check whether the customers table still uses TEXT UUID keys."""
+        for row in cursor.execute("PRAGMA table_info(customers)").fetchall():
+            if row[1] == "id":
+                return row[2].upper() == "TEXT"
+        return False
+    
+    def _copy_legacy_tables(self, conn: sqlite3.Connection):
+        """Copy rows from the *_old TEXT-keyed tables, converting IDs to blobs."""
+        def to_blob(value):
+            # Rows written after the switch to blobs may already be bytes
+            return value if isinstance(value, bytes) else uuid.UUID(value).bytes
+        conn.create_function("uuid_blob", 1, to_blob, deterministic=True)
+        conn.execute("""
+            INSERT INTO customers
+            (id, first_name, last_name, email, phone, company, industry,
+             annual_revenue, employee_count, status, lead_source, created_at, updated_at)
+            SELECT uuid_blob(id), first_name, last_name, email, phone, company, industry,
+                   annual_revenue, employee_count, status, lead_source, created_at, updated_at
+            FROM customers_old
+        """)
+        conn.execute("""
+            INSERT INTO interactions
+            (id, customer_id, interaction_type, subject, notes, interaction_date, created_at)
+            SELECT uuid_blob(id), uuid_blob(customer_id), interaction_type, subject, notes,
+                   interaction_date, created_at
+            FROM interactions_old
+        """)
+        conn.execute("""
+            INSERT INTO deals
+            (id, customer_id, deal_name, value, stage, probability, expected_close_date,
+             created_at, updated_at)
+            SELECT uuid_blob(id), uuid_blob(customer_id), deal_name, value, stage, probability,
+                   expected_close_date, created_at, updated_at
+            FROM deals_old
+        """)
+        for table in ("customers", "interactions", "deals"):
+            conn.execute(f"DROP TABLE {table}_old")
+    
+    def _query(self, query: str, params: tuple) -> tuple[list[str], list[tuple]]:
+        cursor = self.conn.execute(query, params)
+        rows = cursor.fetchall()
+        return [col[0] for col in cursor.description], rows
+    
+    def _write(self, query: str, params: tuple) -> int:
+        self.conn.execute("BEGIN")
+        try:
+            cursor = self.conn.execute(query, params)
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return cursor.lastrowid
+    
+    def _write_many(self, query: str, params_seq: list[tuple]) -> int:
+        with self.conn as conn:
+            conn.execute("BEGIN")
+            cursor = conn.executemany(query, params_seq)
+            return cursor.rowcount
+    
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
     
-    def execute_write(self, query: str, params: tuple = ()) -> str:
+    async def execute_query(self, query: str, params: tuple = ()) -> tuple[list[str], list[tuple]]:
+        """Execute a SELECT query safely with parameterized inputs.
+
+        Returns the column names and the raw row tuples.
+        """
+        return await self._run(self._query, query, params)
+    
+    async def execute_write(self, query: str, params: tuple = ()) -> int:
         """Execute INSERT/UPDATE/DELETE queries safely."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid
+        return await self._run(self._write, query, params)
+    
+    async def execute_many(self, query: str, params_seq: list[tuple]) -> int:
+        """Execute a write for every params tuple inside a single transaction."""
+        return await self._run(self._write_many, query, params_seq)
+
+# SQL statements, shared between calls so sqlite3's statement cache can reuse them
+
+# Customer columns returned to clients (excludes the generated search_blob)
+_CUSTOMER_COLUMNS = (
+    "id, first_name, last_name, email, phone, company, industry, "
+    "annual_revenue, employee_count, status, lead_source, created_at, updated_at"
+)
+
+_SQL_ADD_CUSTOMER = """
+    INSERT INTO customers 
+    (id, first_name, last_name, email, phone, company, industry, 
+     annual_revenue, employee_count, lead_source)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_SEARCH_ALL = f"""
+    SELECT {_CUSTOMER_COLUMNS} FROM customers 
+    WHERE search_blob LIKE lower(?)
+    ORDER BY last_name, first_name
+    LIMIT ? OFFSET ?
+"""
+
+_SQL_SEARCH_NAME = f"""
+    SELECT {_CUSTOMER_COLUMNS} FROM customers 
+    WHERE first_name LIKE ? OR last_name LIKE ?
+    ORDER BY last_name, first_name
+    LIMIT ? OFFSET ?
+"""
+
+_SQL_SEARCH_EMAIL = f"SELECT {_CUSTOMER_COLUMNS} FROM customers WHERE email LIKE ? ORDER BY email LIMIT ? OFFSET ?"
+
+_SQL_SEARCH_COMPANY = f"SELECT {_CUSTOMER_COLUMNS} FROM customers WHERE company LIKE ? ORDER BY company LIMIT ? OFFSET ?"
+
+_SQL_SEARCH_INDUSTRY = f"SELECT {_CUSTOMER_COLUMNS} FROM customers WHERE industry LIKE ? ORDER BY industry LIMIT ? OFFSET ?"
+
+_SQL_GET_CUSTOMER = f"SELECT {_CUSTOMER_COLUMNS} FROM customers WHERE id = ?"
+
+_SQL_ADD_INTERACTION = """
+    INSERT INTO interactions (id, customer_id, interaction_type, subject, notes)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_ADD_DEAL = """
+    INSERT INTO deals (id, customer_id, deal_name, value, stage, probability, expected_close_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_ADD_SAMPLE_CUSTOMER = """
+    INSERT OR IGNORE INTO customers 
+    (id, first_name, last_name, email, phone, company, industry, 
+     annual_revenue, employee_count, lead_source)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_CUSTOMERS_BY_INDUSTRY = """
+    SELECT 
+        industry,
+        COUNT(*) as customer_count,
+        AVG(annual_revenue) as avg_revenue,
+        SUM(annual_revenue) as total_revenue,
+        AVG(employee_count) as avg_employees
+    FROM customers 
+    WHERE industry != '' 
+    GROUP BY industry
+    ORDER BY customer_count DESC
+"""
+
+_SQL_DEAL_PIPELINE = """
+    SELECT 
+        stage,
+        COUNT(*) as deal_count,
+        SUM(value) as total_value,
+        AVG(value) as avg_deal_size,
+        AVG(probability) as avg_probability,
+        SUM(value * probability) as weighted_value
+    FROM deals
+    GROUP BY stage
+    ORDER BY 
+        CASE stage
+            WHEN 'prospecting' THEN 1
+            WHEN 'qualification' THEN 2
+            WHEN 'proposal' THEN 3
+            WHEN 'negotiation' THEN 4
+            WHEN 'closed-won' THEN 5
+            WHEN 'closed-lost' THEN 6
+            ELSE 7
+        END
+"""
+
+_SQL_TOP_CUSTOMERS_BY_REVENUE = """
+    SELECT 
+        first_name,
+        last_name,
+        company,
+        industry,
+        annual_revenue,
+        email
+    FROM customers
+    WHERE annual_revenue > 0
+    ORDER BY annual_revenue DESC
+    LIMIT 10
+"""
+
+_SQL_RECENT_INTERACTIONS = """
+    SELECT 
+        i.*,
+        c.first_name,
+        c.last_name,
+        c.company
+    FROM interactions i
+    JOIN customers c ON i.customer_id = c.id
+    WHERE i.interaction_date >= ?
+    ORDER BY i.interaction_date DESC
+    LIMIT ?
+"""
 
 # Initialize database
 db = CRMDatabase(DB_PATH)
 
+# Cached tool output. get_customer keeps the most recent lookups; the analytics
+# tools expire after a short TTL. Every write clears both.
+CUSTOMER_CACHE_SIZE = 512
+ANALYTICS_CACHE_TTL = 30.0
+_customer_cache: OrderedDict[bytes, str] = OrderedDict()
+_analytics_cache: dict[str, tuple[float, str]] = {}
+
+def _get_cached_customer(customer_id: bytes) -> str | None:
+    text = _customer_cache.get(customer_id)
+    if text is not None:
+        _customer_cache.move_to_end(customer_id)
+    return text
+
+def _cache_customer(customer_id: bytes, text: str) -> None:
+    _customer_cache[customer_id] = text
+    if len(_customer_cache) > CUSTOMER_CACHE_SIZE:
+        _customer_cache.popitem(last=False)
+
+def _get_cached_analytics(tool_name: str) -> str | None:
+    entry = _analytics_cache.get(tool_name)
+    if entry is None or time.monotonic() - entry[0] > ANALYTICS_CACHE_TTL:
+        return None
+    return entry[1]
+
+def _cache_analytics(tool_name: str, text: str) -> None:
+    _analytics_cache[tool_name] = (time.monotonic(), text)
+
+def _clear_caches() -> None:
+    """Drop cached results after the underlying tables change."""
+    _customer_cache.clear()
+    _analytics_cache.clear()
+
+# Tool definitions are static, so build them once at import
+_TOOL_LIST = [
+    types.Tool(
+        name="add_customer",
+        description="Add a new customer to the CRM system",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "first_name": {"type": "string", "description": "Customer's first name"},
+                "last_name": {"type": "string", "description": "Customer's last name"},
+                "email": {"type": "string", "description": "Customer's email address"},
+                "phone": {"type": "string", "description": "Customer's phone number"},
+                "company": {"type": "string", "description": "Customer's company name"},
+                "industry": {"type": "string", "description": "Customer's industry"},
+                "annual_revenue": {"type": "number", "description": "Company's annual revenue"},
+                "employee_count": {"type": "integer", "description": "Number of employees"},
+                "lead_source": {"type": "string", "description": "How the lead was acquired"}
+            },
+            "required": ["first_name", "last_name", "email"]
+        }
+    ),
+    types.Tool(
+        name="search_customers",
+        description="Search for customers by name, email, company, or industry",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "search_term": {"type": "string", "description": "The term to search for"},
+                "search_field": {"type": "string", "description": "Field to search in", "enum": ["all", "name", "email", "company", "industry"]},
+                "limit": {"type": "integer", "description": f"Maximum number of customers to return (default: {SEARCH_DEFAULT_LIMIT}, max: {SEARCH_MAX_LIMIT})"},
+                "offset": {"type": "integer", "description": "Number of matching customers to skip, for paging (default: 0)"}
+            },
+            "required": ["search_term"]
+        }
+    ),
+    types.Tool(
+        name="get_customer",
+        description="Get detailed information about a specific customer",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "customer_id": {"type": "string", "description": "The unique customer identifier"}
+            },
+            "required": ["customer_id"]
+        }
+    ),
+    types.Tool(
+        name="add_interaction",
+        description="Add a customer interaction record",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "customer_id": {"type": "string", "description": "The customer's unique identifier"},
+                "interaction_type": {"type": "string", "description": "Type of interaction (call, email, meeting, etc.)"},
+                "subject": {"type": "string", "description": "Brief subject of the interaction"},
+                "notes": {"type": "string", "description": "Detailed notes about the interaction"}
+            },
+            "required": ["customer_id", "interaction_type"]
+        }
+    ),
+    types.Tool(
+        name="add_deal",
+        description="Add a new deal for a customer",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "customer_id": {"type": "string", "description": "The customer's unique identifier"},
+                "deal_name": {"type": "string", "description": "Name/description of the deal"},
+                "value": {"type": "number", "description": "Monetary value of the deal"},
+                "stage": {"type": "string", "description": "Current stage", "enum": ["prospecting", "qualification", "proposal", "negotiation", "closed-won", "closed-lost"]},
+                "probability": {"type": "number", "description": "Probability of closing (0.0 to 1.0)"},
+                "expected_close_date": {"type": "string", "description": "Expected close date (YYYY-MM-DD format)"}
+            },
+            "required": ["customer_id", "deal_name", "value"]
+        }
+    ),
+    types.Tool(
+        name="populate_sample_data",
+        description="Populate the database with sample customer data for testing",
+        inputSchema={"type": "object", "properties": {}}
+    ),
+    types.Tool(
+        name="analyze_customers_by_industry",
+        description="Analyze customer distribution by industry",
+        inputSchema={"type": "object", "properties": {}}
+    ),
+    types.Tool(
+        name="analyze_deal_pipeline",
+        description="Analyze the sales deal pipeline",
+        inputSchema={"type": "object", "properties": {}}
+    ),
+    types.Tool(
+        name="get_top_customers_by_revenue",
+        description="Get top customers by annual revenue",
+        inputSchema={"type": "object", "properties": {}}
+    ),
+    types.Tool(
+        name="get_recent_interactions",
+        description="Get recent customer interactions",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "days": {"type": "integer", "description": "Number of days back to search (default: 7)"}
+            }
+        }
+    )
+]
+
 @app.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
     """List available CRM tools."""
-    return [
-        types.Tool(
-            name="add_customer",
-            description="Add a new customer to the CRM system",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "first_name": {"type": "string", "description": "Customer's first name"},
-                    "last_name": {"type": "string", "description": "Customer's last name"},
-                    "email": {"type": "string", "description": "Customer's email address"},
-                    "phone": {"type": "string", "description": "Customer's phone number"},
-                    "company": {"type": "string", "description": "Customer's company name"},
-                    "industry": {"type": "string", "description": "Customer's industry"},
-                    "annual_revenue": {"type": "number", "description": "Company's annual revenue"},
-                    "employee_count": {"type": "integer", "description": "Number of employees"},
-                    "lead_source": {"type": "string", "description": "How the lead was acquired"}
-                },
-                "required": ["first_name", "last_name", "email"]
-            }
-        ),
-        types.Tool(
-            name="search_customers",
-            description="Search for customers by name, email, company, or industry",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "search_term": {"type": "string", "description": "The term to search for"},
-                    "search_field": {"type": "string", "description": "Field to search in", "enum": ["all", "name", "email", "company", "industry"]}
-                },
-                "required": ["search_term"]
-            }
-        ),
-        types.Tool(
-            name="get_customer",
-            description="Get detailed information about a specific customer",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "customer_id": {"type": "string", "description": "The unique customer identifier"}
-                },
-                "required": ["customer_id"]
-            }
-        ),
-        types.Tool(
-            name="add_interaction",
-            description="Add a customer interaction record",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "customer_id": {"type": "string", "description": "The customer's unique identifier"},
-                    "interaction_type": {"type": "string", "description": "Type of interaction (call, email, meeting, etc.)"},
-                    "subject": {"type": "string", "description": "Brief subject of the interaction"},
-                    "notes": {"type": "string", "description": "Detailed notes about the interaction"}
-                },
-                "required": ["customer_id", "interaction_type"]
-            }
-        ),
-        types.Tool(
-            name="add_deal",
-            description="Add a new deal for a customer",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "customer_id": {"type": "string", "description": "The customer's unique identifier"},
-                    "deal_name": {"type": "string", "description": "Name/description of the deal"},
-                    "value": {"type": "number", "description": "Monetary value of the deal"},
-                    "stage": {"type": "string", "description": "Current stage", "enum": ["prospecting", "qualification", "proposal", "negotiation", "closed-won", "closed-lost"]},
-                    "probability": {"type": "number", "description": "Probability of closing (0.0 to 1.0)"},
-                    "expected_close_date": {"type": "string", "description": "Expected close date (YYYY-MM-DD format)"}
-                },
-                "required": ["customer_id", "deal_name", "value"]
-            }
-        ),
-        types.Tool(
-            name="populate_sample_data",
-            description="Populate the database with sample customer data for testing",
-            inputSchema={"type": "object", "properties": {}}
-        ),
-        types.Tool(
-            name="analyze_customers_by_industry",
-            description="Analyze customer distribution by industry",
-            inputSchema={"type": "object", "properties": {}}
-        ),
-        types.Tool(
-            name="analyze_deal_pipeline",
-            description="Analyze the sales deal pipeline",
-            inputSchema={"type": "object", "properties": {}}
-        ),
-        types.Tool(
-            name="get_top_customers_by_revenue",
-            description="Get top customers by annual revenue",
-            inputSchema={"type": "object", "properties": {}}
-        ),
-        types.Tool(
-            name="get_recent_interactions",
-            description="Get recent customer interactions",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "days": {"type": "integer", "description": "Number of days back to search (default: 7)"}
-                }
-            }
+    return _TOOL_LIST
+
+async def _tool_add_customer(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Add a new customer record."""
+    customer_id = uuid.uuid4()
+    try:
+        query = _SQL_ADD_CUSTOMER
+        params = (
+            customer_id.bytes,
+            arguments.get("first_name", ""),
+            arguments.get("last_name", ""),
+            arguments.get("email", ""),
+            arguments.get("phone", ""),
+            arguments.get("company", ""),
+            arguments.get("industry", ""),
+            arguments.get("annual_revenue", 0.0),
+            arguments.get("employee_count", 0),
+            arguments.get("lead_source", "")
         )
-    ]
+        
+        await db.execute_write(query, params)
+        _clear_caches()
+        return [types.TextContent(type="text", text=f"✅ Customer successfully added with ID: {customer_id.hex}")]
+        
+    except sqlite3.IntegrityError as e:
+        if "UNIQUE constraint failed: customers.email" in str(e):
+            return [types.TextContent(type="text", text=f"❌ Error: Customer with email {arguments.get('email')} already exists")]
+        return [types.TextContent(type="text", text=f"❌ Database error: {str(e)}")]
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error adding customer: {str(e)}")]
 
-@app.call_tool()
-async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextContent]:
-    """Handle tool calls."""
-    
-    if name == "add_customer":
-        customer_id = str(uuid.uuid4())
-        try:
-            query = """
-                INSERT INTO customers 
-                (id, first_name, last_name, email, phone, company, industry, 
-                 annual_revenue, employee_count, lead_source)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            params = (
-                customer_id,
-                arguments.get("first_name", ""),
-                arguments.get("last_name", ""),
-                arguments.get("email", ""),
-                arguments.get("phone", ""),
-                arguments.get("company", ""),
-                arguments.get("industry", ""),
-                arguments.get("annual_revenue", 0.0),
-                arguments.get("employee_count", 0),
-                arguments.get("lead_source", "")
-            )
-            
-            db.execute_write(query, params)
-            return [types.TextContent(type="text", text=f"✅ Customer successfully added with ID: {customer_id}")]
-            
-        except sqlite3.IntegrityError as e:
-            if "UNIQUE constraint failed: customers.email" in str(e):
-                return [types.TextContent(type="text", text=f"❌ Error: Customer with email {arguments.get('email')} already exists")]
-            return [types.TextContent(type="text", text=f"❌ Database error: {str(e)}")]
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error adding customer: {str(e)}")]
-    
-    elif name == "search_customers":
-        try:
-            search_term = arguments["search_term"]
-            search_field = arguments.get("search_field", "all")
-            
-            if search_field == "all":
-                query = """
-                    SELECT * FROM customers 
-                    WHERE first_name LIKE ? OR last_name LIKE ? OR email LIKE ? 
-                    OR company LIKE ? OR industry LIKE ?
-                    ORDER BY last_name, first_name
-                """
-                search_pattern = f"%{search_term}%"
-                params = (search_pattern, search_pattern, search_pattern, 
-                         search_pattern, search_pattern)
-            elif search_field == "name":
-                query = """
-                    SELECT * FROM customers 
-                    WHERE first_name LIKE ? OR last_name LIKE ?
-                    ORDER BY last_name, first_name
-                """
-                search_pattern = f"%{search_term}%"
-                params = (search_pattern, search_pattern)
-            elif search_field == "email":
-                query = "SELECT * FROM customers WHERE email LIKE ? ORDER BY email"
-                params = (f"%{search_term}%",)
-            elif search_field == "company":
-                query = "SELECT * FROM customers WHERE company LIKE ? ORDER BY company"
-                params = (f"%{search_term}%",)
-            elif search_field == "industry":
-                query = "SELECT * FROM customers WHERE industry LIKE ? ORDER BY industry"
-                params = (f"%{search_term}%",)
-            else:
-                return [types.TextContent(type="text", text=f"❌ Invalid search field: {search_field}. Use: all, name, email, company, or industry")]
-            
-            results = db.execute_query(query, params)
-            
-            if not results:
-                return [types.TextContent(type="text", text=f"🔍 No customers found matching '{search_term}' in {search_field}")]
-                
-            return [types.TextContent(type="text", text=f"🔍 Found {len(results)} customers:\n\n{json.dumps(results, indent=2, default=str)}")]
-            
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error searching customers: {str(e)}")]
-    
-    elif name == "get_customer":
-        try:
-            query = "SELECT * FROM customers WHERE id = ?"
-            results = db.execute_query(query, (arguments["customer_id"],))
-            
-            if not results:
-                return [types.TextContent(type="text", text=f"❌ No customer found with ID: {arguments['customer_id']}")]
-                
-            customer = results[0]
-            return [types.TextContent(type="text", text=f"👤 Customer Details:\n\n{json.dumps(customer, indent=2, default=str)}")]
-            
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error retrieving customer: {str(e)}")]
-    
-    elif name == "add_interaction":
-        interaction_id = str(uuid.uuid4())
-        try:
-            query = """
-                INSERT INTO interactions (id, customer_id, interaction_type, subject, notes)
-                VALUES (?, ?, ?, ?, ?)
-            """
-            params = (
-                interaction_id, 
-                arguments["customer_id"], 
-                arguments["interaction_type"], 
-                arguments.get("subject", ""), 
-                arguments.get("notes", "")
-            )
-            
-            db.execute_write(query, params)
-            return [types.TextContent(type="text", text=f"✅ Interaction successfully added with ID: {interaction_id}")]
-            
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error adding interaction: {str(e)}")]
-    
-    elif name == "add_deal":
-        deal_id = str(uuid.uuid4())
-        try:
-            query = """
-                INSERT INTO deals (id, customer_id, deal_name, value, stage, probability, expected_close_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            params = (
-                deal_id, 
-                arguments["customer_id"], 
-                arguments["deal_name"], 
-                arguments["value"],
-                arguments.get("stage", "prospecting"),
-                arguments.get("probability", 0.0),
-                arguments.get("expected_close_date", None)
-            )
-            
-            db.execute_write(query, params)
-            return [types.TextContent(type="text", text=f"✅ Deal successfully added with ID: {deal_id}")]
-            
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error adding deal: {str(e)}")]
-    
-    elif name == "populate_sample_data":
-        try:
-            sample_customers = [
-                ("John", "Doe", "john.doe@techcorp.com", "+1-555-0101", "TechCorp", "Technology", 5000000, 50, "website"),
-                ("Jane", "Smith", "jane.smith@retailplus.com", "+1-555-0102", "RetailPlus", "Retail", 2000000, 25, "referral"),
-                ("Bob", "Johnson", "bob@manufacturing.com", "+1-555-0103", "ManufacturingCo", "Manufacturing", 10000000, 100, "trade_show"),
-                ("Alice", "Williams", "alice@healthsys.com", "+1-555-0104", "HealthSystems", "Healthcare", 15000000, 200, "cold_call"),
-                ("Charlie", "Brown", "charlie@fintech.com", "+1-555-0105", "FinTech Solutions", "Financial", 8000000, 75, "linkedin"),
-            ]
+async def _tool_search_customers(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Search customers by one field or across all of them."""
+    try:
+        search_term = arguments["search_term"]
+        search_field = arguments.get("search_field", "all")
+        limit = max(1, min(int(arguments.get("limit", SEARCH_DEFAULT_LIMIT)), SEARCH_MAX_LIMIT))
+        offset = max(0, int(arguments.get("offset", 0)))
+        
+        if search_field == "all":
+            query = _SQL_SEARCH_ALL
+            params = (f"%{search_term}%",)
+        elif search_field == "name":
+            query = _SQL_SEARCH_NAME
+            search_pattern = f"%{search_term}%"
+            params = (search_pattern, search_pattern)
+        elif search_field == "email":
+            query = _SQL_SEARCH_EMAIL
+            params = (f"%{search_term}%",)
+        elif search_field == "company":
+            query = _SQL_SEARCH_COMPANY
+            params = (f"%{search_term}%",)
+        elif search_field == "industry":
+            query = _SQL_SEARCH_INDUSTRY
+            params = (f"%{search_term}%",)
+        else:
+            return [types.TextContent(type="text", text=f"❌ Invalid search field: {search_field}. Use: all, name, email, company, or industry")]
+        
+        # Fetch one extra row to learn whether another page exists
+        columns, results = await db.execute_query(query, params + (limit + 1, offset))
+        has_more = len(results) > limit
+        results = results[:limit]
+        
+        if not results:
+            return [types.TextContent(type="text", text=f"🔍 No customers found matching '{search_term}' in {search_field}")]
             
-            for customer in sample_customers:
-                customer_id = str(uuid.uuid4())
-                query = """
-                    INSERT OR IGNORE INTO customers 
-                    (id, first_name, last_name, email, phone, company, industry, 
-                     annual_revenue, employee_count, lead_source)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                params = (customer_id,) + customer
-                db.execute_write(query, params)
-            
-            return [types.TextContent(type="text", text="✅ Sample data populated successfully! Added 5 sample customers.")]
-            
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error populating sample data: {str(e)}")]
-    
-    elif name == "analyze_customers_by_industry":
-        try:
-            query = """
-                SELECT 
-                    industry,
-                    COUNT(*) as customer_count,
-                    AVG(annual_revenue) as avg_revenue,
-                    SUM(annual_revenue) as total_revenue,
-                    AVG(employee_count) as avg_employees
-                FROM customers 
-                WHERE industry != '' 
-                GROUP BY industry
-                ORDER BY customer_count DESC
-            """
-            results = db.execute_query(query)
-            
-            if not results:
-                return [types.TextContent(type="text", text="📊 No industry data available")]
-                
-            return [types.TextContent(type="text", text=f"📊 Customer Analysis by Industry:\n\n{json.dumps(results, indent=2, default=str)}")]
-            
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error analyzing industries: {str(e)}")]
-    
-    elif name == "analyze_deal_pipeline":
+        text = f"🔍 Found {len(results)} customers:\n\n{_dump_rows(columns, results)}"
+        if has_more:
+            text += f"\n\nMore results available; search again with offset={offset + limit}"
+        return [types.TextContent(type="text", text=text)]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error searching customers: {str(e)}")]
+
+async def _tool_get_customer(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Fetch a single customer by ID."""
+    try:
         try:
-            query = """
-                SELECT 
-                    stage,
-                    COUNT(*) as deal_count,
-                    SUM(value) as total_value,
-                    AVG(value) as avg_deal_size,
-                    AVG(probability) as avg_probability,
-                    SUM(value * probability) as weighted_value
-                FROM deals
-                GROUP BY stage
-                ORDER BY 
-                    CASE stage
-                        WHEN 'prospecting' THEN 1
-                        WHEN 'qualification' THEN 2
-                        WHEN 'proposal' THEN 3
-                        WHEN 'negotiation' THEN 4
-                        WHEN 'closed-won' THEN 5
-                        WHEN 'closed-lost' THEN 6
-                        ELSE 7
-                    END
-            """
-            results = db.execute_query(query)
-            
-            if not results:
-                return [types.TextContent(type="text", text="📈 No deals in pipeline")]
-                
-            return [types.TextContent(type="text", text=f"📈 Deal Pipeline Analysis:\n\n{json.dumps(results, indent=2, default=str)}")]
+            customer_id = _parse_id(arguments["customer_id"])
+        except ValueError:
+            return [types.TextContent(type="text", text=f"❌ No customer found with ID: {arguments['customer_id']}")]
+        
+        text = _get_cached_customer(customer_id)
+        if text is not None:
+            return [types.TextContent(type="text", text=text)]
+        
+        query = _SQL_GET_CUSTOMER
+        columns, results = await db.execute_query(query, (customer_id,))
+        
+        if not results:
+            return [types.TextContent(type="text", text=f"❌ No customer found with ID: {arguments['customer_id']}")]
             
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error analyzing pipeline: {str(e)}")]
-    
-    elif name == "get_top_customers_by_revenue":
-        try:
-            query = """
-                SELECT 
-                    first_name,
-                    last_name,
-                    company,
-                    industry,
-                    annual_revenue,
-                    email
-                FROM customers
-                WHERE annual_revenue > 0
-                ORDER BY annual_revenue DESC
-                LIMIT 10
-            """
-            results = db.execute_query(query)
+        customer = dict(zip(columns, results[0]))
+        text = f"👤 Customer Details:\n\n{_dump(customer)}"
+        _cache_customer(customer_id, text)
+        return [types.TextContent(type="text", text=text)]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error retrieving customer: {str(e)}")]
+
+async def _tool_add_interaction(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Record an interaction with a customer."""
+    interaction_id = uuid.uuid4()
+    try:
+        query = _SQL_ADD_INTERACTION
+        params = (
+            interaction_id.bytes, 
+            _parse_id(arguments["customer_id"]), 
+            arguments["interaction_type"], 
+            arguments.get("subject", ""), 
+            arguments.get("notes", "")
+        )
+        
+        await db.execute_write(query, params)
+        _clear_caches()
+        return [types.TextContent(type="text", text=f"✅ Interaction successfully added with ID: {interaction_id.hex}")]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error adding interaction: {str(e)}")]
+
+async def _tool_add_deal(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Add a deal for a customer."""
+    deal_id = uuid.uuid4()
+    try:
+        query = _SQL_ADD_DEAL
+        params = (
+            deal_id.bytes, 
+            _parse_id(arguments["customer_id"]), 
+            arguments["deal_name"], 
+            arguments["value"],
+            arguments.get("stage", "prospecting"),
+            arguments.get("probability", 0.0),
+            arguments.get("expected_close_date", None)
+        )
+        
+        await db.execute_write(query, params)
+        _clear_caches()
+        return [types.TextContent(type="text", text=f"✅ Deal successfully added with ID: {deal_id.hex}")]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error adding deal: {str(e)}")]
+
+async def _tool_populate_sample_data(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Insert the sample customers used for testing."""
+    try:
+        sample_customers = [
+            ("John", "Doe", "john.doe@techcorp.com", "+1-555-0101", "TechCorp", "Technology", 5000000, 50, "website"),
+            ("Jane", "Smith", "jane.smith@retailplus.com", "+1-555-0102", "RetailPlus", "Retail", 2000000, 25, "referral"),
+            ("Bob", "Johnson", "bob@manufacturing.com", "+1-555-0103", "ManufacturingCo", "Manufacturing", 10000000, 100, "trade_show"),
+            ("Alice", "Williams", "alice@healthsys.com", "+1-555-0104", "HealthSystems", "Healthcare", 15000000, 200, "cold_call"),
+            ("Charlie", "Brown", "charlie@fintech.com", "+1-555-0105", "FinTech Solutions", "Financial", 8000000, 75, "linkedin"),
+        ]
+        
+        query = _SQL_ADD_SAMPLE_CUSTOMER
+        rows = [(uuid.uuid4().bytes,) + customer for customer in sample_customers]
+        await db.execute_many(query, rows)
+        _clear_caches()
+        
+        return [types.TextContent(type="text", text="✅ Sample data populated successfully! Added 5 sample customers.")]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error populating sample data: {str(e)}")]
+
+async def _tool_analyze_customers_by_industry(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Summarize customers and revenue per industry."""
+    try:
+        text = _get_cached_analytics("analyze_customers_by_industry")
+        if text is not None:
+            return [types.TextContent(type="text", text=text)]
+        
+        query = _SQL_CUSTOMERS_BY_INDUSTRY
+        columns, results = await db.execute_query(query)
+        
+        if not results:
+            return [types.TextContent(type="text", text="📊 No industry data available")]
             
-            if not results:
-                return [types.TextContent(type="text", text="💰 No customers with revenue data found")]
-                
-            return [types.TextContent(type="text", text=f"💰 Top Customers by Revenue:\n\n{json.dumps(results, indent=2, default=str)}")]
+        text = f"📊 Customer Analysis by Industry:\n\n{_dump_rows(columns, results)}"
+        _cache_analytics("analyze_customers_by_industry", text)
+        return [types.TextContent(type="text", text=text)]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error analyzing industries: {str(e)}")]
+
+async def _tool_analyze_deal_pipeline(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Summarize deals per pipeline stage."""
+    try:
+        text = _get_cached_analytics("analyze_deal_pipeline")
+        if text is not None:
+            return [types.TextContent(type="text", text=text)]
+        
+        query = _SQL_DEAL_PIPELINE
+        columns, results = await db.execute_query(query)
+        
+        if not results:
+            return [types.TextContent(type="text", text="📈 No deals in pipeline")]
             
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error retrieving top customers: {str(e)}")]
-    
-    elif name == "get_recent_interactions":
-        try:
-            days = arguments.get("days", 7)
-            query = """
-                SELECT 
-                    i.*,
-                    c.first_name,
-                    c.last_name,
-                    c.company
-                FROM interactions i
-                JOIN customers c ON i.customer_id = c.id
-                WHERE i.interaction_date >= datetime('now', '-' || ? || ' days')
-                ORDER BY i.interaction_date DESC
-            """
-            results = db.execute_query(query, (days,))
+        text = f"📈 Deal Pipeline Analysis:\n\n{_dump_rows(columns, results)}"
+        _cache_analytics("analyze_deal_pipeline", text)
+        return [types.TextContent(type="text", text=text)]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error analyzing pipeline: {str(e)}")]
+
+async def _tool_get_top_customers_by_revenue(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """List the ten customers with the highest annual revenue."""
+    try:
+        text = _get_cached_analytics("get_top_customers_by_revenue")
+        if text is not None:
+            return [types.TextContent(type="text", text=text)]
+        
+        query = _SQL_TOP_CUSTOMERS_BY_REVENUE
+        columns, results = await db.execute_query(query)
+        
+        if not results:
+            return [types.TextContent(type="text", text="💰 No customers with revenue data found")]
             
-            if not results:
-                return [types.TextContent(type="text", text=f"📅 No interactions found in the last {days} days")]
-                
-            return [types.TextContent(type="text", text=f"📅 Recent Interactions (Last {days} days):\n\n{json.dumps(results, indent=2, default=str)}")]
+        text = f"💰 Top Customers by Revenue:\n\n{_dump_rows(columns, results)}"
+        _cache_analytics("get_top_customers_by_revenue", text)
+        return [types.TextContent(type="text", text=text)]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error retrieving top customers: {str(e)}")]
+
+async def _tool_get_recent_interactions(arguments: dict[str, Any]) -> list[types.TextContent]:
+    """List interactions from the last N days."""
+    try:
+        days = int(arguments.get("days", 7))
+        # interaction_date holds CURRENT_TIMESTAMP text (UTC, 'YYYY-MM-DD HH:MM:SS'),
+        # so a cutoff in the same format compares directly against the index
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        query = _SQL_RECENT_INTERACTIONS
+        columns, results = await db.execute_query(query, (cutoff, RECENT_INTERACTIONS_LIMIT + 1))
+        truncated = len(results) > RECENT_INTERACTIONS_LIMIT
+        results = results[:RECENT_INTERACTIONS_LIMIT]
+        
+        if not results:
+            return [types.TextContent(type="text", text=f"📅 No interactions found in the last {days} days")]
             
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"❌ Error retrieving recent interactions: {str(e)}")]
-    
-    else:
+        text = f"📅 Recent Interactions (Last {days} days):\n\n{_dump_rows(columns, results)}"
+        if truncated:
+            text += f"\n\nShowing the {RECENT_INTERACTIONS_LIMIT} most recent; use a smaller 'days' value to narrow the range"
+        return [types.TextContent(type="text", text=text)]
+        
+    except Exception as e:
+        return [types.TextContent(type="text", text=f"❌ Error retrieving recent interactions: {str(e)}")]
+
+# Tool name -> handler, built once at import
+_DISPATCH = {
+    "add_customer": _tool_add_customer,
+    "search_customers": _tool_search_customers,
+    "get_customer": _tool_get_customer,
+    "add_interaction": _tool_add_interaction,
+    "add_deal": _tool_add_deal,
+    "populate_sample_data": _tool_populate_sample_data,
+    "analyze_customers_by_industry": _tool_analyze_customers_by_industry,
+    "analyze_deal_pipeline": _tool_analyze_deal_pipeline,
+    "get_top_customers_by_revenue": _tool_get_top_customers_by_revenue,
+    "get_recent_interactions": _tool_get_recent_interactions,
+}
+
+@app.call_tool()
+async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextContent]:
+    """Handle tool calls."""
+    handler = _DISPATCH.get(name)
+    if handler is None:
         raise ValueError(f"Unknown tool: {name}")
+    return await handler(arguments)
 
 async def main():
     # Run the server using stdin/stdout streams
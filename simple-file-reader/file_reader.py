@@ -2,6 +2,7 @@
 
 import asyncio
 import os
+import stat
 import sys
 from typing import Any, Sequence
 
@@ -12,39 +13,97 @@ import mcp.server.stdio
 # Create server instance
 app = Server("file-reader")
 
+# Home directory, looked up once at startup
+_HOME = os.path.expanduser("~")
+
+# Largest file read_file will load into memory
+MAX_FILE_SIZE = 4 * 1024 * 1024
+
+# Read size used once the stat-reported size is exhausted
+READ_CHUNK_SIZE = 64 * 1024
+
+def _resolve(path: str) -> str:
+    """Expand a leading ~ using the cached home directory."""
+    if path == "~" or path.startswith("~/"):
+        return _HOME + path[1:]
+    if path.startswith("~"):
+        # ~user form needs a password database lookup
+        return os.path.expanduser(path)
+    return path
+
+def _read_file_sync(file_path: str, size_hint: int) -> str | None:
+    """Read and decode a whole file; run in a worker thread.
+
+    Returns None if the file turns out to be larger than MAX_FILE_SIZE.
+    """
+    # Raw fd reads skip Python's buffered I/O layers. The stat size only sizes
+    # the first read: procfs/sysfs files report 0 and files may grow, so keep
+    # reading until EOF, stopping one byte past the limit.
+    limit = MAX_FILE_SIZE + 1
+    chunks = []
+    total = 0
+    want = size_hint or READ_CHUNK_SIZE
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        while total < limit:
+            chunk = os.read(fd, min(want, limit - total))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            total += len(chunk)
+            want = READ_CHUNK_SIZE
+    finally:
+        os.close(fd)
+    if total > MAX_FILE_SIZE:
+        return None
+    content = b"".join(chunks).decode('utf-8')
+    # Match text-mode open(): universal newlines turn \r\n and lone \r into \n
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+def _list_dir_sync(directory_path: str) -> list[str]:
+    """List a directory in one scandir pass; run in a worker thread."""
+    with os.scandir(directory_path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    return [f"📁 {e.name}/" if e.is_dir() else f"📄 {e.name}" for e in entries]
+
+# Tool definitions are static, so build them once at import
+_TOOL_LIST = [
+    types.Tool(
+        name="read_file",
+        description="Read a text file from your local machine",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string", 
+                    "description": "Path to the text file you want to read"
+                }
+            },
+            "required": ["file_path"]
+        }
+    ),
+    types.Tool(
+        name="list_files",
+        description="List files in a directory",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "directory_path": {
+                    "type": "string", 
+                    "description": "Path to the directory to list (defaults to home directory)"
+                }
+            },
+            "required": []
+        }
+    )
+]
+
 @app.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
     """List available tools."""
-    return [
-        types.Tool(
-            name="read_file",
-            description="Read a text file from your local machine",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_path": {
-                        "type": "string", 
-                        "description": "Path to the text file you want to read"
-                    }
-                },
-                "required": ["file_path"]
-            }
-        ),
-        types.Tool(
-            name="list_files",
-            description="List files in a directory",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "directory_path": {
-                        "type": "string", 
-                        "description": "Path to the directory to list (defaults to home directory)"
-                    }
-                },
-                "required": []
-            }
-        )
-    ]
+    return _TOOL_LIST
 
 @app.call_tool()
 async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
@@ -54,31 +113,45 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
         file_path = arguments["file_path"]
         
         # Expand ~ to home directory
-        file_path = os.path.expanduser(file_path)
+        file_path = _resolve(file_path)
         
         try:
-            # Check if file exists
-            if not os.path.exists(file_path):
+            # One stat() answers both "does it exist" and "is it a file"
+            try:
+                st = os.stat(file_path)
+            except (FileNotFoundError, NotADirectoryError):
                 return [types.TextContent(
                     type="text", 
                     text=f"Error: File '{file_path}' does not exist"
                 )]
             
             # Check if it's actually a file
-            if not os.path.isfile(file_path):
+            if not stat.S_ISREG(st.st_mode):
                 return [types.TextContent(
                     type="text", 
                     text=f"Error: '{file_path}' is not a file"
                 )]
             
-            # Read the file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Refuse files too large to return in a single response
+            if st.st_size > MAX_FILE_SIZE:
+                return [types.TextContent(
+                    type="text", 
+                    text=f"Error: '{file_path}' is too large ({st.st_size} bytes, limit is {MAX_FILE_SIZE})"
+                )]
             
-            return [types.TextContent(
-                type="text", 
-                text=f"Content of '{file_path}':\n\n{content}"
-            )]
+            # Read the file without blocking the event loop
+            content = await asyncio.to_thread(_read_file_sync, file_path, st.st_size)
+            if content is None:
+                return [types.TextContent(
+                    type="text", 
+                    text=f"Error: '{file_path}' is too large (limit is {MAX_FILE_SIZE} bytes)"
+                )]
+            
+            # Header and body go out as separate items so the content is not copied again
+            return [
+                types.TextContent(type="text", text=f"Content of '{file_path}':"),
+                types.TextContent(type="text", text=content)
+            ]
             
         except PermissionError:
             return [types.TextContent(
@@ -100,31 +173,27 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
         directory_path = arguments.get("directory_path", "~")
         
         # Expand ~ to home directory
-        directory_path = os.path.expanduser(directory_path)
+        directory_path = _resolve(directory_path)
         
         try:
-            # Check if directory exists
-            if not os.path.exists(directory_path):
+            # One stat() answers both "does it exist" and "is it a directory"
+            try:
+                st = os.stat(directory_path)
+            except (FileNotFoundError, NotADirectoryError):
                 return [types.TextContent(
                     type="text", 
                     text=f"Error: Directory '{directory_path}' does not exist"
                 )]
             
             # Check if it's actually a directory
-            if not os.path.isdir(directory_path):
+            if not stat.S_ISDIR(st.st_mode):
                 return [types.TextContent(
                     type="text", 
                     text=f"Error: '{directory_path}' is not a directory"
                 )]
             
             # List files and directories
-            items = []
-            for item in sorted(os.listdir(directory_path)):
-                item_path = os.path.join(directory_path, item)
-                if os.path.isdir(item_path):
-                    items.append(f"📁 {item}/")
-                else:
-                    items.append(f"📄 {item}")
+            items = await asyncio.to_thread(_list_dir_sync, directory_path)
             
             files_list = "\n".join(items)
             return [types.TextContent(